@@ -1,3 +1,11 @@
+import argparse
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path is used without it
+    np = None
+
 """
 --- Day 1: Secret Entrance ---
 The Elves have good news and bad news.
@@ -60,29 +68,27 @@ Analyze the rotations in your attached document. What's the actual password to o
 
 input_file = "puzzles/inputs/day1.txt"
 
-# Read the input file
-with open(input_file, "r") as f:
-    rotations = [line.strip() for line in f.readlines()]
 
-# Start position
-position = 50
-zero_count = 0
+def iter_rotations(stream):
+    """Yield (direction, distance) pairs parsed lazily from a binary stream.
 
-# Process each rotation
-for rotation in rotations:
-    direction = rotation[0]
-    distance = int(rotation[1:])
+    The stream is consumed line by line, so memory stays constant no matter how
+    large the rotation log is.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        direction = "L" if line[0] == ord("L") else "R"
+        yield direction, int(line[1:])
 
-    if direction == "L":
-        position = (position - distance) % 100
-    else:  # direction == 'R'
-        position = (position + distance) % 100
 
-    # Check if we're at 0
-    if position == 0:
-        zero_count += 1
+def rotate(position, direction, distance):
+    """Return the dial position after applying a single rotation."""
+    if direction == "L":
+        return (position - distance) % 100
+    return (position + distance) % 100  # direction == 'R'
 
-print(f"The password is: {zero_count}")
 
 """
 --- Part Two ---
@@ -114,16 +120,108 @@ Be careful: if the dial were pointing at 50, a single rotation like R1000 would
 Using password method 0x434C49434B, what is the password to open the door?
 """
 
-# Part 2: Count all times the dial points at 0 during any rotation
-position = 50
-zero_count_method2 = 0
-for rotation in rotations:
-    direction = rotation[0]
-    distance = int(rotation[1:])
-    step = -1 if direction == "L" else 1
-    for i in range(1, distance + 1):
-        pos = (position + step * i) % 100
-        if pos == 0:
-            zero_count_method2 += 1
-    position = (position + step * distance) % 100
-print(f"The password (method 0x434C49434B) is: {zero_count_method2}")
+
+def count_zero_crossings(position, direction, distance):
+    """Count how many clicks of a rotation leave the dial pointing at 0.
+
+    Counts the multiples of 100 between the start and end of the rotation
+    (exclusive of the start, inclusive of the end) with floor division, so the
+    cost is O(1) regardless of the distance.
+    """
+    if direction == "L":
+        # Clicks land on position - 1 down to position - distance
+        return (position - 1) // 100 - (position - distance - 1) // 100
+    # Clicks land on position + 1 up to position + distance
+    return (position + distance) // 100 - position // 100
+
+
+def process_rotations(rotations, position=50):
+    """Apply rotations in a single pass, updating both passwords together.
+
+    Returns a tuple of (part 1 password, part 2 password).
+    """
+    zero_count = 0
+    zero_count_method2 = 0
+    for direction, distance in rotations:
+        zero_count_method2 += count_zero_crossings(position, direction, distance)
+        position = rotate(position, direction, distance)
+        # Check if we're at 0
+        if position == 0:
+            zero_count += 1
+    return zero_count, zero_count_method2
+
+
+# Longest distance that always fits in an int64 (10**18 - 1 < 2**63)
+MAX_INT64_DIGITS = 18
+
+
+def parse_rotation_deltas(data):
+    """Parse raw rotation bytes into an int64 array of signed distances (L < 0, R > 0).
+
+    Returns None when a distance has too many digits to fit in an int64.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    is_left = buf == ord("L")
+    is_letter = is_left | (buf == ord("R"))
+    letters = np.flatnonzero(is_letter)
+    if len(letters) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # Every digit belongs to the rotation whose letter precedes it
+    token = np.cumsum(is_letter) - 1
+    digit_idx = np.flatnonzero((buf >= ord("0")) & (buf <= ord("9")))
+    digit_token = token[digit_idx]
+    lengths = np.bincount(digit_token, minlength=len(letters))
+    if lengths.max() > MAX_INT64_DIGITS:
+        return None
+    token_starts = np.cumsum(lengths) - lengths
+
+    # Weight each digit by its place value within its rotation, then sum per rotation
+    place = (token_starts + lengths)[digit_token] - 1 - np.arange(len(digit_idx))
+    values = (buf[digit_idx] - ord("0")).astype(np.int64) * np.power(10, place, dtype=np.int64)
+    distances = np.add.reduceat(values, token_starts)
+
+    return np.where(is_left[letters], -distances, distances)
+
+
+def process_rotations_numpy(data, position=50):
+    """Vectorized equivalent of process_rotations over the raw bytes of a rotation log.
+
+    Positions are the prefix sum of the signed deltas, kept unwrapped so the
+    crossing count for each rotation is the number of multiples of 100 it spans.
+    Logs whose distances or unwrapped positions could overflow int64 are handed to
+    the pure-Python path, which has arbitrary precision.
+    """
+    deltas = parse_rotation_deltas(data)
+    if deltas is None or abs(position) + np.abs(deltas).sum(dtype=np.float64) >= 2**62:
+        return process_rotations(iter_rotations(data.splitlines()), position)
+    ends = position + np.cumsum(deltas)
+    starts = np.concatenate(([position], ends[:-1]))
+
+    zero_count = np.count_nonzero(ends % 100 == 0)
+    crossings = np.where(
+        deltas >= 0,
+        ends // 100 - starts // 100,
+        (starts - 1) // 100 - (ends - 1) // 100,
+    )
+    return int(zero_count), int(crossings.sum())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Day 1: Secret Entrance")
+    parser.add_argument("input", nargs="?", default=input_file, help="rotation file, or '-' to read from stdin")
+    parser.add_argument("--numpy", action="store_true", help="use the vectorized NumPy backend if available")
+    args = parser.parse_args()
+
+    if args.numpy and np is None:
+        print("NumPy is not installed, falling back to the pure-Python backend", file=sys.stderr)
+
+    stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    with stream:
+        if args.numpy and np is not None:
+            zero_count, zero_count_method2 = process_rotations_numpy(stream.read())
+        else:
+            zero_count, zero_count_method2 = process_rotations(iter_rotations(stream))
+
+    print(f"The password is: {zero_count}")
+    print(f"The password (method 0x434C49434B) is: {zero_count_method2}")
@@ -1,3 +1,7 @@
+import argparse
+import random
+from concurrent.futures import ProcessPoolExecutor
+
 """
 --- Day 2: Gift Shop ---
 You get inside and take the elevator to its only other stop: the gift shop. "Thank you for visiting the North Pole!" gleefully exclaims a nearby sign. You aren't sure who is even allowed to visit the North Pole, but you know you can access the lobby through here, and from there you can access the rest of the North Pole base.
@@ -52,52 +56,163 @@ def is_invalid_id(n):
     return s[:mid] == s[mid:]
 
 
-# Read the input file
-with open(input_file, "r") as f:
-    input_text = f.read().strip()
+def pattern_bounds(start, end, length, pattern_len):
+    """Return (multiplier, low, high) for length-digit IDs built from a pattern_len-digit pattern.
 
-# Parse ranges
-ranges = []
-for range_str in input_text.split(","):
-    range_str = range_str.strip()
-    if range_str:
-        start, end = map(int, range_str.split("-"))
-        ranges.append((start, end))
+    Such an ID equals pattern * multiplier, where the multiplier is the repunit
+    10^(length-pattern_len) + ... + 10^pattern_len + 1; low and high bound the
+    patterns whose ID lands inside [start, end] (empty when low > high).
+    """
+    multiplier = (10**length - 1) // (10**pattern_len - 1)
+    low = max(10 ** (pattern_len - 1), -(-start // multiplier))
+    high = min(10**pattern_len - 1, end // multiplier)
+    return multiplier, low, high
 
-# Find all invalid IDs and sum them
-total = 0
-for start, end in ranges:
-    for num in range(start, end + 1):
-        if is_invalid_id(num):
-            total += num
 
-print(f"Part 1: Sum of all invalid IDs: {total}")
+def generate_invalid_ids(start, end, mode=1):
+    """Yield, in ascending order, the invalid IDs in [start, end] without scanning the range.
 
+    For each digit length and repeat count only the patterns whose product lands
+    inside the range are generated. Mode 1 only allows a pattern repeated exactly
+    twice; mode 2 allows any repeat count of at least two.
+    """
+    for length in range(len(str(start)), len(str(end)) + 1):
+        if mode == 1:
+            repeat_counts = [2] if length % 2 == 0 else []
+        else:
+            repeat_counts = [k for k in range(2, length + 1) if length % k == 0]
 
-def is_invalid_id_part2(n):
-    """Check if a number is made of a sequence repeated at least twice."""
-    s = str(n)
-    length = len(s)
+        # A set de-duplicates IDs reachable from several repeat counts (e.g. 111111 is 1 x 6 and 11 x 3)
+        found = set()
+        for repeats in repeat_counts:
+            multiplier, low, high = pattern_bounds(start, end, length, length // repeats)
+            for pattern in range(low, high + 1):
+                found.add(pattern * multiplier)
 
-    # Try all possible pattern lengths (from 1 to length/2)
-    for pattern_len in range(1, length // 2 + 1):
-        # Check if the string can be formed by repeating a pattern of this length
-        if length % pattern_len == 0:
-            pattern = s[:pattern_len]
-            repeats = length // pattern_len
-            if repeats >= 2 and pattern * repeats == s:
-                return True
-    return False
+        yield from sorted(found)
+
+
+def mobius(n):
+    """Return the Mobius function of n."""
+    result = 1
+    factor = 2
+    while factor * factor <= n:
+        if n % factor == 0:
+            n //= factor
+            if n % factor == 0:
+                return 0
+            result = -result
+        factor += 1
+    if n > 1:
+        result = -result
+    return result
+
+
+def sum_repeated_patterns(start, end, length, pattern_len):
+    """Sum the length-digit IDs in [start, end] made of a repeated pattern_len-digit pattern.
+
+    The valid patterns form a contiguous run, so the sum is an arithmetic series
+    scaled by the repunit multiplier.
+    """
+    multiplier, low, high = pattern_bounds(start, end, length, pattern_len)
+    if low > high:
+        return 0
+    return (low + high) * (high - low + 1) // 2 * multiplier
+
+
+def sum_invalid_in_range(start, end, mode=1):
+    """Sum the invalid IDs in [start, end] in O(digits^2) without enumerating them.
+
+    Mode 1 sums IDs made of a pattern repeated exactly twice. Mode 2 sums IDs
+    made of a pattern repeated at least twice: the IDs repeating a d-digit
+    pattern include every ID whose shortest period divides d, so the union over
+    the proper divisors of the length is taken by Mobius inclusion-exclusion.
+    """
+    total = 0
+    for length in range(len(str(start)), len(str(end)) + 1):
+        if mode == 1:
+            if length % 2 == 0:
+                total += sum_repeated_patterns(start, end, length, length // 2)
+            continue
+
+        for pattern_len in range(1, length):
+            if length % pattern_len == 0:
+                total -= mobius(length // pattern_len) * sum_repeated_patterns(start, end, length, pattern_len)
+    return total
+
+
+def parse_ranges(input_text):
+    """Parse comma-separated start-end ranges into a list of (start, end) tuples."""
+    ranges = []
+    for range_str in input_text.split(","):
+        range_str = range_str.strip()
+        if range_str:
+            start, end = map(int, range_str.split("-"))
+            ranges.append((start, end))
+    return ranges
+
+
+def merge_ranges(ranges):
+    """Merge overlapping or adjacent ranges and return a sorted list of disjoint ranges."""
+    if not ranges:
+        return []
+
+    # Sort ranges by start position
+    sorted_ranges = sorted(ranges)
+    merged = [sorted_ranges[0]]
+
+    for current_start, current_end in sorted_ranges[1:]:
+        last_start, last_end = merged[-1]
+
+        # If current range overlaps with the last merged range, merge them
+        if current_start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, current_end))
+        else:
+            # No overlap, add as new range
+            merged.append((current_start, current_end))
 
+    return merged
 
-# Part 2: Find all invalid IDs with new rules (repeated at least twice)
-total_part2 = 0
-for start, end in ranges:
-    for num in range(start, end + 1):
-        if is_invalid_id_part2(num):
-            total_part2 += num
 
-print(f"Part 2: Sum of all invalid IDs: {total_part2}")
+def split_into_chunks(ranges, chunk_count):
+    """Split ranges into at most chunk_count contiguous chunks of near-equal size.
+
+    Each range costs the same to sum in closed form regardless of its width, so
+    chunks are balanced by the number of ranges they hold.
+    """
+    chunk_count = max(1, min(chunk_count, len(ranges)))
+    size, extra = divmod(len(ranges), chunk_count)
+    chunks = []
+    index = 0
+    for chunk_idx in range(chunk_count):
+        next_index = index + size + (1 if chunk_idx < extra else 0)
+        chunks.append(ranges[index:next_index])
+        index = next_index
+    return chunks
+
+
+def sum_chunk(ranges):
+    """Return the (part 1, part 2) invalid ID sums for a chunk of ranges."""
+    total = 0
+    total_part2 = 0
+    for start, end in ranges:
+        total += sum_invalid_in_range(start, end, mode=1)
+        total_part2 += sum_invalid_in_range(start, end, mode=2)
+    return total, total_part2
+
+
+def sum_ranges(ranges, workers=1):
+    """Merge the ranges and sum their invalid IDs for both parts, fanning out over worker processes."""
+    merged = merge_ranges(ranges)
+    if workers <= 1 or len(merged) <= 1:
+        return sum_chunk(merged)
+
+    # A few chunks per worker keeps the pool busy if some chunks finish early
+    chunks = split_into_chunks(merged, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = list(executor.map(sum_chunk, chunks))
+    return sum(part[0] for part in partials), sum(part[1] for part in partials)
+
 
 """
 --- Part Two ---
@@ -122,3 +237,59 @@ Adding up all the invalid IDs in this example produces 4174379265.
 
 What do you get if you add up all of the invalid IDs using these new rules?
 """
+
+
+def is_invalid_id_part2(n):
+    """Check if a number is made of a sequence repeated at least twice."""
+    s = str(n)
+    length = len(s)
+
+    # Try all possible pattern lengths (from 1 to length/2)
+    for pattern_len in range(1, length // 2 + 1):
+        # Check if the string can be formed by repeating a pattern of this length
+        if length % pattern_len == 0:
+            pattern = s[:pattern_len]
+            repeats = length // pattern_len
+            if repeats >= 2 and pattern * repeats == s:
+                return True
+    return False
+
+
+def cross_check(trials=500, max_width=2000, seed=2025):
+    """
+    Compare generate_invalid_ids and sum_invalid_in_range against the brute-force
+    checks on small random ranges.
+    """
+    rng = random.Random(seed)
+    for _ in range(trials):
+        start = rng.randint(1, 10 ** rng.randint(1, 7))
+        end = start + rng.randint(0, max_width)
+        for mode, check in ((1, is_invalid_id), (2, is_invalid_id_part2)):
+            expected_ids = [num for num in range(start, end + 1) if check(num)]
+            generated_ids = list(generate_invalid_ids(start, end, mode))
+            if generated_ids != expected_ids:
+                raise AssertionError(f"Mode {mode} generated IDs mismatch for {start}-{end}")
+            actual = sum_invalid_in_range(start, end, mode)
+            if actual != sum(expected_ids):
+                raise AssertionError(f"Mode {mode} mismatch for {start}-{end}: {actual} != {sum(expected_ids)}")
+    print(f"Cross-check passed for {trials} random ranges")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Day 2: Gift Shop")
+    parser.add_argument("input", nargs="?", default=input_file, help="comma-separated range file")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--check", action="store_true", help="cross-check the closed-form sums against brute force")
+    args = parser.parse_args()
+
+    if args.check:
+        cross_check()
+
+    # Read the input file
+    with open(args.input, "r") as f:
+        ranges = parse_ranges(f.read().strip())
+
+    # Merge overlapping ranges so no ID is counted twice, then sum both parts
+    total, total_part2 = sum_ranges(ranges, workers=args.workers)
+    print(f"Part 1: Sum of all invalid IDs: {total}")
+    print(f"Part 2: Sum of all invalid IDs: {total_part2}")
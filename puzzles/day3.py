@@ -1,3 +1,10 @@
+import argparse
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
 """
 --- Day 3: Lobby ---
 You descend a short staircase, enter the surprisingly vast lobby, and are quickly cleared by
@@ -81,30 +88,12 @@ What is the new total output joltage?
 
 input_file = "puzzles/inputs/day3.txt"
 
-# Read the input file
-with open(input_file, "r") as f:
-    banks = [line.strip() for line in f.readlines()]
-
-# Part 1: Find maximum joltage from each bank by selecting exactly two batteries
-total_joltage = 0
-for bank in banks:
-    max_joltage = 0
-    # Try all pairs of positions
-    for i in range(len(bank)):
-        for j in range(i + 1, len(bank)):
-            # Form a two-digit number from batteries at positions i and j
-            joltage = int(bank[i] + bank[j])
-            max_joltage = max(max_joltage, joltage)
-    total_joltage += max_joltage
-
-print(f"Part 1: Total output joltage: {total_joltage}")
 
-
-# Part 2: Find maximum joltage by selecting exactly 12 batteries from each bank
 def max_k_digits(s, k):
     """
     Find the largest k-digit number by selecting k digits from string s in order.
-    Uses a greedy approach with a stack.
+    Uses a greedy approach with a stack, so each bank is scanned once in O(n)
+    whatever the value of k.
     """
     n = len(s)
     to_remove = n - k
@@ -126,9 +115,195 @@ def max_k_digits(s, k):
     return int("".join(stack))
 
 
-total_joltage_part2 = 0
-for bank in banks:
-    max_joltage = max_k_digits(bank, 12)
-    total_joltage_part2 += max_joltage
+def max_k_digits_bytes(bank, k, stack=None):
+    """
+    Byte-level variant of max_k_digits for a bytes-like bank of ASCII digits.
+    Digits stay as byte values in a preallocated stack buffer with an explicit
+    top pointer, so no per-digit str objects are created, and the integer is
+    accumulated directly from the kept digits.
+    """
+    if stack is None:
+        stack = bytearray(k)
+    to_remove = len(bank) - k
+    top = 0
+
+    for digit in bank:
+        # Remove smaller digits from the stack if we still have removals left
+        # and the current digit is larger
+        while top and to_remove > 0 and stack[top - 1] < digit:
+            top -= 1
+            to_remove -= 1
+        if top < k:
+            stack[top] = digit
+            top += 1
+        else:
+            # The stack is full, so this digit would be trimmed from the end anyway
+            to_remove -= 1
+
+    value = 0
+    for i in range(top):
+        value = value * 10 + stack[i] - 48
+    return value
+
+
+def total_max_k_digits(data, k):
+    """
+    Sum max_k_digits_bytes over every bank in the raw contents of a bank file.
+    Banks are zero-copy memoryview slices between newlines and share a single
+    stack buffer, so allocation is proportional to the file rather than to the
+    number of banks times k.
+    """
+    view = memoryview(data)
+    stack = bytearray(k)
+    total = 0
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = len(data)
+        line_end = end
+        if line_end > start and data[line_end - 1] == ord("\r"):
+            line_end -= 1
+        if line_end > start:
+            total += max_k_digits_bytes(view[start:line_end], k, stack)
+        start = end + 1
+    return total
+
+
+class BankIndex:
+    """
+    Precomputed "next occurrence" table for answering many k-selections on one bank.
+    next_pos[d][i] is the position of the first digit d at or after position i
+    (or n if there is none), so each query picks the largest digit that still
+    leaves room for the remaining picks in O(10 * k) instead of rescanning the bank.
+    """
+
+    def __init__(self, bank):
+        self.n = len(bank)
+        self.next_pos = [array("l", [self.n]) * (self.n + 1) for _ in range(10)]
+        for i in range(self.n - 1, -1, -1):
+            digit = ord(bank[i]) - 48
+            for d in range(10):
+                self.next_pos[d][i] = i if d == digit else self.next_pos[d][i + 1]
+
+    def max_k(self, k):
+        """Return the largest k-digit number formed by selecting k digits in order."""
+        value = 0
+        pos = 0
+        for remaining in range(k, 0, -1):
+            # The pick must leave at least remaining - 1 digits after it
+            last_allowed = self.n - remaining
+            for d in range(9, -1, -1):
+                j = self.next_pos[d][pos]
+                if j <= last_allowed:
+                    value = value * 10 + d
+                    pos = j + 1
+                    break
+        return value
+
+    def max_k_many(self, ks):
+        """Return a dict mapping each k in ks to its best selection."""
+        return {k: self.max_k(k) for k in ks}
+
+
+def split_file_ranges(path, jobs):
+    """
+    Split a file into at most jobs (start, end) byte ranges whose boundaries
+    fall just after a newline, so no bank is cut between two ranges.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for job in range(1, jobs):
+            target = max(size * job // jobs, boundaries[-1])
+            f.seek(target)
+            # Finish the bank the target offset landed in
+            if target > 0:
+                f.readline()
+            boundary = min(f.tell(), size)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+    if size > boundaries[-1]:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def evaluate_file_range(path, start, end):
+    """
+    Evaluate every bank in the byte range [start, end) of a bank file.
+    Returns (part 1 sum, part 2 sum, bytes read, bank count, elapsed seconds).
+    """
+    begin = time.perf_counter()
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    total_joltage = total_max_k_digits(data, 2)
+    total_joltage_part2 = total_max_k_digits(data, 12)
+    bank_count = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+    return total_joltage, total_joltage_part2, len(data), bank_count, time.perf_counter() - begin
+
+
+def evaluate_file_parallel(path, jobs):
+    """
+    Evaluate a bank file with one worker process per newline-aligned byte range,
+    printing each worker's throughput, and return the (part 1, part 2) totals.
+    """
+    file_ranges = split_file_ranges(path, jobs)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(evaluate_file_range, path, start, end) for start, end in file_ranges]
+        results = [future.result() for future in futures]
+
+    for worker, (start, end) in enumerate(file_ranges):
+        _, _, byte_count, bank_count, elapsed = results[worker]
+        elapsed = max(elapsed, 1e-9)
+        print(
+            f"  Worker {worker + 1}: bytes {start}-{end}, {bank_count:,} banks in {elapsed:.3f}s "
+            f"({byte_count / elapsed / 1_000_000:.2f} MB/s, {bank_count / elapsed:,.0f} banks/s)"
+        )
+
+    return sum(result[0] for result in results), sum(result[1] for result in results)
+
+
+def cross_check(banks, ks=(2, 12, 20, 50), trials=200, seed=2025):
+    """
+    Compare BankIndex.max_k_many and max_k_digits_bytes against max_k_digits for
+    each k that fits, on the given banks plus random ones.
+    """
+    rng = random.Random(seed)
+    random_banks = ["".join(rng.choice("123456789") for _ in range(rng.randint(1, 120))) for _ in range(trials)]
+    for bank in list(banks) + random_banks:
+        usable_ks = [k for k in ks if k <= len(bank)]
+        expected = {k: max_k_digits(bank, k) for k in usable_ks}
+        if BankIndex(bank).max_k_many(usable_ks) != expected:
+            raise AssertionError(f"BankIndex mismatch for bank {bank}")
+        if {k: max_k_digits_bytes(bank.encode(), k) for k in usable_ks} != expected:
+            raise AssertionError(f"max_k_digits_bytes mismatch for bank {bank}")
+    print(f"Cross-check passed for {len(banks) + trials} banks with k in {list(ks)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Day 3: Lobby")
+    parser.add_argument("input", nargs="?", default=input_file, help="bank file, one bank per line")
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--check", action="store_true", help="cross-check BankIndex and the bytes engine on the input")
+    args = parser.parse_args()
+
+    if args.check:
+        with open(args.input, "r") as f:
+            cross_check([line.strip() for line in f if line.strip()])
+
+    if args.jobs > 1:
+        total_joltage, total_joltage_part2 = evaluate_file_parallel(args.input, args.jobs)
+    else:
+        # Read the input file
+        with open(args.input, "rb") as f:
+            data = f.read()
+
+        # Part 1: Find maximum joltage from each bank by selecting exactly two batteries
+        total_joltage = total_max_k_digits(data, 2)
+
+        # Part 2: Find maximum joltage by selecting exactly 12 batteries from each bank
+        total_joltage_part2 = total_max_k_digits(data, 12)
 
-print(f"Part 2: Total output joltage: {total_joltage_part2}")
+    print(f"Part 1: Total output joltage: {total_joltage}")
+    print(f"Part 2: Total output joltage: {total_joltage_part2}")
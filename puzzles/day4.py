@@ -1,3 +1,16 @@
+import argparse
+import os
+import sys
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path is used without it
+    np = None
+
 """
 --- Day 4: Printing Department ---
 You ride the escalator down to the printing department. They're clearly getting ready for
@@ -195,12 +208,7 @@ and their forklifts?
 
 input_file = "puzzles/inputs/day4.txt"
 
-# Read the input file
-with open(input_file, "r") as f:
-    grid = [line.strip() for line in f.readlines()]
-
-rows = len(grid)
-cols = len(grid[0]) if rows > 0 else 0
+NEIGHBOR_OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
 
 
 # Part 1: Count rolls that can be accessed (fewer than 4 adjacent rolls)
@@ -218,15 +226,16 @@ def count_adjacent_rolls(grid, row, col):
     return count
 
 
-accessible_rolls = 0
-for r in range(rows):
-    for c in range(cols):
-        if grid[r][c] == "@":
-            adjacent = count_adjacent_rolls(grid, r, c)
-            if adjacent < 4:
-                accessible_rolls += 1
-
-print(f"Part 1: Number of rolls that can be accessed: {accessible_rolls}")
+def count_accessible_rolls(grid):
+    """Count the rolls that currently have fewer than 4 adjacent rolls."""
+    accessible_rolls = 0
+    for r in range(len(grid)):
+        for c in range(len(grid[0])):
+            if grid[r][c] == "@":
+                adjacent = count_adjacent_rolls(grid, r, c)
+                if adjacent < 4:
+                    accessible_rolls += 1
+    return accessible_rolls
 
 
 # Part 2: Simulate removing accessible rolls repeatedly
@@ -242,19 +251,316 @@ def find_accessible_rolls(grid):
     return accessible
 
 
-# Create a mutable copy of the grid
-grid_copy = [list(row) for row in grid]
-total_removed = 0
-
-while True:
-    accessible = find_accessible_rolls(grid_copy)
-    if not accessible:
-        break
-
-    # Remove all accessible rolls
-    for r, c in accessible:
-        grid_copy[r][c] = "."
-
-    total_removed += len(accessible)
-
-print(f"Part 2: Total rolls that can be removed: {total_removed}")
+def peel_rounds(grid):
+    """
+    Return the number of rolls removed in each round of the removal simulation.
+
+    Neighbor counts are computed once. Removing a roll decrements the counts of
+    its neighbors, and a neighbor whose count drops below 4 is queued for the
+    next round, so total work is O(cells) rather than a full grid rescan per round.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    counts = [[count_adjacent_rolls(grid, r, c) if grid[r][c] == "@" else 0 for c in range(cols)] for r in range(rows)]
+    queued = [[False] * cols for _ in range(rows)]
+
+    current_round = []
+    for r in range(rows):
+        for c in range(cols):
+            if grid[r][c] == "@" and counts[r][c] < 4:
+                queued[r][c] = True
+                current_round.append((r, c))
+
+    round_counts = []
+    while current_round:
+        round_counts.append(len(current_round))
+        next_round = []
+        for r, c in current_round:
+            for dr, dc in NEIGHBOR_OFFSETS:
+                nr, nc = r + dr, c + dc
+                # Rolls already queued are being removed, so their counts no longer matter
+                if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == "@" and not queued[nr][nc]:
+                    counts[nr][nc] -= 1
+                    if counts[nr][nc] < 4:
+                        queued[nr][nc] = True
+                        next_round.append((nr, nc))
+        current_round = next_round
+
+    return round_counts
+
+
+def load_grid_numpy(data):
+    """Load the raw bytes of a grid file as a uint8 array with 1 for each roll."""
+    lines = data.split()
+    if not lines:
+        return np.zeros((0, 0), dtype=np.uint8)
+    cells = np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(len(lines), len(lines[0]))
+    return (cells == ord("@")).astype(np.uint8)
+
+
+def neighbor_counts_numpy(rolls):
+    """Count the rolls in the 8 adjacent positions of every cell with shifted slices of a padded grid."""
+    rows, cols = rolls.shape
+    padded = np.pad(rolls, 1)
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for dr, dc in NEIGHBOR_OFFSETS:
+        counts += padded[1 + dr : 1 + dr + rows, 1 + dc : 1 + dc + cols]
+    return counts
+
+
+def peel_rounds_numpy(rolls):
+    """
+    Vectorized equivalent of peel_rounds on a uint8 roll array.
+
+    Each round removes every accessible roll at once and subtracts the removed
+    mask's neighbor counts from the running counts instead of recounting the grid.
+    """
+    rolls = rolls.copy()
+    counts = neighbor_counts_numpy(rolls)
+    round_counts = []
+    while True:
+        accessible = (rolls == 1) & (counts < 4)
+        removed = int(np.count_nonzero(accessible))
+        if not removed:
+            break
+        round_counts.append(removed)
+        removed_mask = accessible.astype(np.uint8)
+        rolls -= removed_mask
+        counts -= neighbor_counts_numpy(removed_mask)
+    return round_counts
+
+
+ROLL_BITS = bytes.maketrans(b"@.", b"10")
+
+
+def load_grid_bits(data):
+    """
+    Load the raw bytes of a grid file as one int bitset per row (bit c set when column c
+    holds a roll), returning the row list and the grid width.
+    """
+    lines = data.split()
+    cols = len(lines[0]) if lines else 0
+    # Reverse each line so column 0 becomes the least significant bit
+    return [int(line[::-1].translate(ROLL_BITS), 2) for line in lines], cols
+
+
+def accessible_bits(above, row, below, mask):
+    """
+    Return the bitset of rolls in row with fewer than 4 adjacent rolls.
+
+    The 8 neighbor bitsets are summed with a bit-sliced ripple-carry adder, so every
+    column is counted in parallel; a count of 4 or more sets bit 2 or bit 3 of the sum.
+    """
+    neighbors = (
+        (above << 1) & mask,
+        above,
+        above >> 1,
+        (row << 1) & mask,
+        row >> 1,
+        (below << 1) & mask,
+        below,
+        below >> 1,
+    )
+    bit0 = bit1 = bit2 = bit3 = 0
+    for neighbor in neighbors:
+        carry0 = bit0 & neighbor
+        bit0 ^= neighbor
+        carry1 = bit1 & carry0
+        bit1 ^= carry0
+        carry2 = bit2 & carry1
+        bit2 ^= carry1
+        bit3 |= carry2
+    return row & ~(bit2 | bit3)
+
+
+def peel_rounds_bits(rows, cols):
+    """
+    Bit-parallel equivalent of peel_rounds on a list of row bitsets.
+
+    Only rows next to a removal can change, so each round re-checks just those rows.
+    """
+    rows = list(rows)
+    mask = (1 << cols) - 1
+    height = len(rows)
+    dirty = range(height)
+    round_counts = []
+    while True:
+        removals = {}
+        for r in dirty:
+            above = rows[r - 1] if r > 0 else 0
+            below = rows[r + 1] if r + 1 < height else 0
+            accessible = accessible_bits(above, rows[r], below, mask)
+            if accessible:
+                removals[r] = accessible
+        if not removals:
+            break
+
+        round_counts.append(sum(accessible.bit_count() for accessible in removals.values()))
+        next_dirty = set()
+        for r, accessible in removals.items():
+            rows[r] &= ~accessible
+            next_dirty.update(range(max(r - 1, 0), min(r + 2, height)))
+        dirty = sorted(next_dirty)
+    return round_counts
+
+
+# Worker-side handle on the shared grid, set once per process by attach_shared_grid
+_shared_grid = None
+
+
+def attach_shared_grid(name, rows, row_bytes, cols):
+    """Pool initializer: attach the worker to the shared-memory grid without copying it."""
+    global _shared_grid
+    _shared_grid = (shared_memory.SharedMemory(name=name, track=False), rows, row_bytes, cols)
+
+
+def read_row_bits(buf, r, row_bytes):
+    """Read row r of a shared grid of packed little-endian row bitsets."""
+    return int.from_bytes(buf[r * row_bytes : (r + 1) * row_bytes], "little")
+
+
+def write_row_bits(buf, r, row_bytes, bits):
+    """Write a row bitset back into row r of a shared grid of packed row bitsets."""
+    buf[r * row_bytes : (r + 1) * row_bytes] = bits.to_bytes(row_bytes, "little")
+
+
+def find_band_removals(dirty_rows):
+    """
+    Worker task: return {row: accessible bitset} for the dirty rows of one band.
+
+    The rows just outside the band are read as a one-row halo, and the shared grid
+    is only read here, so every band sees the same state within a round.
+    """
+    shm, rows, row_bytes, cols = _shared_grid
+    mask = (1 << cols) - 1
+    needed = {nr for r in dirty_rows for nr in (r - 1, r, r + 1) if 0 <= nr < rows}
+    bits = {nr: read_row_bits(shm.buf, nr, row_bytes) for nr in needed}
+    removals = {}
+    for r in dirty_rows:
+        accessible = accessible_bits(bits.get(r - 1, 0), bits[r], bits.get(r + 1, 0), mask)
+        if accessible:
+            removals[r] = accessible
+    return removals
+
+
+def apply_band_removals(removals):
+    """Worker task: clear the removed rolls of one band in the shared grid."""
+    shm, rows, row_bytes, cols = _shared_grid
+    for r, accessible in removals.items():
+        write_row_bits(shm.buf, r, row_bytes, read_row_bits(shm.buf, r, row_bytes) & ~accessible)
+
+
+def split_bands(rows, band_count):
+    """Split rows into at most band_count contiguous (start, end) bands of near-equal height."""
+    band_count = max(1, min(band_count, rows))
+    return [(rows * band // band_count, rows * (band + 1) // band_count) for band in range(band_count)]
+
+
+def peel_rounds_tiled(data, workers):
+    """
+    Multi-process equivalent of peel_rounds on the raw bytes of a grid file.
+
+    The grid lives in shared memory as packed row bitsets, ceil(cols / 8) bytes per
+    row, and is split into horizontal bands, one task per band. Each round is bulk-synchronous: every band finds its removals against the
+    same grid state, then every band applies its own. A removal on a band's edge row
+    marks the halo row of the neighbouring band dirty for the next round. The first
+    round's removals are exactly the part 1 rolls, counted per band.
+    """
+    row_bits, cols = load_grid_bits(data)
+    rows = len(row_bits)
+    if rows == 0 or cols == 0:
+        return []
+
+    bands = split_bands(rows, workers)
+    band_starts = [start for start, _ in bands]
+    row_bytes = (cols + 7) // 8
+    shm = shared_memory.SharedMemory(create=True, size=rows * row_bytes)
+    try:
+        for r, bits in enumerate(row_bits):
+            write_row_bits(shm.buf, r, row_bytes, bits)
+        with ProcessPoolExecutor(
+            max_workers=len(bands), initializer=attach_shared_grid, initargs=(shm.name, rows, row_bytes, cols)
+        ) as executor:
+            dirty = [list(range(start, end)) for start, end in bands]
+            round_counts = []
+            while True:
+                band_removals = list(executor.map(find_band_removals, dirty))
+                removed = sum(accessible.bit_count() for removals in band_removals for accessible in removals.values())
+                if not removed:
+                    break
+                round_counts.append(removed)
+                list(executor.map(apply_band_removals, band_removals))
+
+                # Route each changed row and its neighbours to the band that owns them
+                changed = {nr for removals in band_removals for r in removals for nr in (r - 1, r, r + 1)}
+                dirty = [[] for _ in bands]
+                for r in sorted(changed):
+                    if 0 <= r < rows:
+                        dirty[bisect_right(band_starts, r) - 1].append(r)
+        return round_counts
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Day 4: Printing Department")
+    parser.add_argument("input", nargs="?", default=input_file, help="grid file of rolls (@) and empty spaces (.)")
+    parser.add_argument("--rounds", action="store_true", help="print how many rolls are removed in each round")
+    parser.add_argument(
+        "--backend", choices=["python", "numpy", "bits", "tiled"], default="python", help="grid engine to use"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes for the tiled backend")
+    parser.add_argument(
+        "--compare", action="store_true", help="also time the single-process bits backend and report the speedup"
+    )
+    args = parser.parse_args()
+
+    if args.backend == "numpy" and np is None:
+        print("NumPy is not installed, falling back to the pure-Python backend", file=sys.stderr)
+        args.backend = "python"
+
+    if args.backend == "numpy":
+        with open(args.input, "rb") as f:
+            rolls = load_grid_numpy(f.read())
+        round_counts = peel_rounds_numpy(rolls)
+        # The first round removes exactly the rolls that are accessible at the start
+        accessible_rolls = round_counts[0] if round_counts else 0
+    elif args.backend == "tiled":
+        with open(args.input, "rb") as f:
+            data = f.read()
+        start_time = time.perf_counter()
+        round_counts = peel_rounds_tiled(data, args.workers)
+        tiled_time = time.perf_counter() - start_time
+        accessible_rolls = round_counts[0] if round_counts else 0
+
+        if args.compare:
+            # Time the single-process bit-packed engine on the same grid for comparison
+            start_time = time.perf_counter()
+            peel_rounds_bits(*load_grid_bits(data))
+            single_time = time.perf_counter() - start_time
+            print(
+                f"Single-process: {single_time:.3f}s, tiled ({args.workers} workers): {tiled_time:.3f}s, "
+                f"speedup: {single_time / max(tiled_time, 1e-9):.2f}x"
+            )
+        else:
+            print(f"Tiled ({args.workers} workers): {tiled_time:.3f}s")
+    elif args.backend == "bits":
+        with open(args.input, "rb") as f:
+            rows, cols = load_grid_bits(f.read())
+        round_counts = peel_rounds_bits(rows, cols)
+        accessible_rolls = round_counts[0] if round_counts else 0
+    else:
+        # Read the input file
+        with open(args.input, "r") as f:
+            grid = [line.strip() for line in f.readlines()]
+        accessible_rolls = count_accessible_rolls(grid)
+        round_counts = peel_rounds(grid)
+
+    print(f"Part 1: Number of rolls that can be accessed: {accessible_rolls}")
+
+    if args.rounds:
+        for removed in round_counts:
+            print(f"Remove {removed} roll{'s' if removed != 1 else ''} of paper")
+    total_removed = sum(round_counts)
+    print(f"Part 2: Total rolls that can be removed: {total_removed}")
@@ -1,3 +1,18 @@
+import argparse
+import hashlib
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path is used without it
+    np = None
+
 """
 --- Day 5: Cafeteria ---
 As the forklifts break through the wall, the Elves are delighted to discover that there was a
@@ -76,40 +91,7 @@ be fresh according to the fresh ingredient ID ranges?
 
 input_file = "puzzles/inputs/day5.txt"
 
-# Read the input file
-with open(input_file, "r") as f:
-    lines = [line.strip() for line in f.readlines()]
-
-# Find the blank line that separates ranges from ingredient IDs
-blank_line_idx = lines.index("")
-
-# Parse the fresh ID ranges
-ranges = []
-for i in range(blank_line_idx):
-    start, end = map(int, lines[i].split("-"))
-    ranges.append((start, end))
-
-# Parse the available ingredient IDs
-ingredient_ids = []
-for i in range(blank_line_idx + 1, len(lines)):
-    if lines[i]:
-        ingredient_ids.append(int(lines[i]))
-
-# Check which ingredient IDs are fresh
-fresh_count = 0
-for ingredient_id in ingredient_ids:
-    is_fresh = False
-    for start, end in ranges:
-        if start <= ingredient_id <= end:
-            is_fresh = True
-            break
-    if is_fresh:
-        fresh_count += 1
 
-print(f"Part 1: Number of fresh ingredient IDs: {fresh_count}")
-
-
-# Part 2: Count total unique ingredient IDs in all ranges
 # Merge overlapping ranges to avoid double-counting
 def merge_ranges(ranges):
     """Merge overlapping ranges and return list of non-overlapping ranges."""
@@ -133,12 +115,285 @@ def merge_ranges(ranges):
     return merged
 
 
-# Merge the ranges
-merged_ranges = merge_ranges(ranges)
-
-# Count total IDs in merged ranges
-total_fresh_ids = 0
-for start, end in merged_ranges:
-    total_fresh_ids += end - start + 1
-
-print(f"Part 2: Total ingredient IDs considered fresh: {total_fresh_ids}")
+# Sorted, disjoint fresh ranges for fast membership checks
+class FreshIndex:
+    """Index of merged fresh ranges answering membership with binary search."""
+
+    def __init__(self, ranges):
+        merged = merge_ranges(ranges)
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def is_fresh(self, ingredient_id):
+        """Check whether an ID falls in any fresh range in O(log n)."""
+        i = bisect_right(self.starts, ingredient_id) - 1
+        return i >= 0 and ingredient_id <= self.ends[i]
+
+    def count_fresh(self, ingredient_ids):
+        """Count fresh IDs by sorting them and sweeping the IDs and ranges together in one pass."""
+        fresh_count = 0
+        i = 0
+        for ingredient_id in sorted(ingredient_ids):
+            # Skip ranges that end before this ID; later IDs are larger, so they can't match them either
+            while i < len(self.ends) and self.ends[i] < ingredient_id:
+                i += 1
+            if i == len(self.ends):
+                break
+            if self.starts[i] <= ingredient_id:
+                fresh_count += 1
+        return fresh_count
+
+
+# Fresh ranges that can be updated in place instead of re-merged from scratch
+class FreshRangeSet(FreshIndex):
+    """Coalesced set of fresh ranges supporting incremental adds and removals."""
+
+    def __init__(self, ranges=()):
+        super().__init__(list(ranges))
+        self.total_fresh = sum(end - start + 1 for start, end in zip(self.starts, self.ends))
+
+    def add(self, start, end):
+        """Add the range start-end, coalescing it with any range it overlaps or touches."""
+        # Ranges lo..hi-1 end at or after start - 1 and begin at or before end + 1
+        lo = bisect_left(self.ends, start - 1)
+        hi = bisect_right(self.starts, end + 1)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+            self.total_fresh -= sum(self.ends[i] - self.starts[i] + 1 for i in range(lo, hi))
+
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+        self.total_fresh += end - start + 1
+
+    def remove(self, start, end):
+        """Remove the range start-end, trimming or splitting the ranges it overlaps."""
+        # Ranges lo..hi-1 end at or after start and begin at or before end
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo >= hi:
+            return
+
+        # Keep the parts of the first and last ranges that stick out of the removed range
+        kept = []
+        if self.starts[lo] < start:
+            kept.append((self.starts[lo], start - 1))
+        if self.ends[hi - 1] > end:
+            kept.append((end + 1, self.ends[hi - 1]))
+
+        self.total_fresh -= sum(self.ends[i] - self.starts[i] + 1 for i in range(lo, hi))
+        self.total_fresh += sum(kept_end - kept_start + 1 for kept_start, kept_end in kept)
+        self.starts[lo:hi] = [kept_start for kept_start, _ in kept]
+        self.ends[lo:hi] = [kept_end for _, kept_end in kept]
+
+    def ranges(self):
+        """Return the current coalesced ranges as (start, end) tuples."""
+        return list(zip(self.starts, self.ends))
+
+
+def parse_database(text):
+    """Parse the database text into a list of (start, end) ranges and a list of ingredient IDs."""
+    lines = [line.strip() for line in text.splitlines()]
+
+    # Find the blank line that separates ranges from ingredient IDs
+    blank_line_idx = lines.index("")
+
+    # Parse the fresh ID ranges
+    ranges = []
+    for i in range(blank_line_idx):
+        start, end = map(int, lines[i].split("-"))
+        ranges.append((start, end))
+
+    # Parse the available ingredient IDs
+    ingredient_ids = []
+    for i in range(blank_line_idx + 1, len(lines)):
+        if lines[i]:
+            ingredient_ids.append(int(lines[i]))
+
+    return ranges, ingredient_ids
+
+
+def parse_ingredient_ids(text):
+    """Parse only the ingredient IDs that follow the blank line of the database text."""
+    lines = [line.strip() for line in text.splitlines()]
+    blank_line_idx = lines.index("")
+    return [int(line) for line in lines[blank_line_idx + 1 :] if line]
+
+
+# On-disk range index: header, then the merged starts and ends as two packed uint64 arrays
+INDEX_MAGIC = b"FRESHIDX"
+INDEX_HEADER = struct.Struct("=8sQQ32s")  # magic, range count, total fresh IDs, source SHA-256
+
+
+def file_digest(path):
+    """Return the SHA-256 digest of a file."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").digest()
+
+
+def save_fresh_index(index_path, merged, source_digest):
+    """Write merged ranges to a binary index file tagged with the digest of their source."""
+    total_fresh = sum(end - start + 1 for start, end in merged)
+    # Write to a temporary file first so a reader never maps a half-written index
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(merged), total_fresh, source_digest))
+        f.write(array("Q", [start for start, _ in merged]).tobytes())
+        f.write(array("Q", [end for _, end in merged]).tobytes())
+    os.replace(temp_path, index_path)
+
+
+# Read-only FreshIndex over a memory-mapped index file
+class MappedFreshIndex(FreshIndex):
+    """FreshIndex whose starts and ends are uint64 views straight into a memory-mapped index file."""
+
+    def __init__(self, index_path):
+        with open(index_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < INDEX_HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{index_path} is too short to be a range index")
+        magic, count, self.total_fresh, self.source_digest = INDEX_HEADER.unpack_from(self._mmap)
+        if magic != INDEX_MAGIC or len(self._mmap) != INDEX_HEADER.size + 16 * count:
+            self._mmap.close()
+            raise ValueError(f"{index_path} is not a valid range index")
+
+        self._view = memoryview(self._mmap)
+        self.starts = self._view[INDEX_HEADER.size : INDEX_HEADER.size + 8 * count].cast("Q")
+        self.ends = self._view[INDEX_HEADER.size + 8 * count :].cast("Q")
+
+    def close(self):
+        """Release the views into the index file, then unmap it."""
+        self.starts.release()
+        self.ends.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def load_fresh_index(source_path, index_path):
+    """
+    Return a MappedFreshIndex for the ranges in source_path, reusing the index file
+    when it was built from identical source bytes and rebuilding it otherwise.
+    """
+    source_digest = file_digest(source_path)
+    if os.path.exists(index_path):
+        try:
+            index = MappedFreshIndex(index_path)
+            if index.source_digest == source_digest:
+                return index
+            # Unmap the stale index before os.replace swaps a new file in at its path
+            index.close()
+        except ValueError:
+            pass  # Unreadable index, rebuild it below
+
+    with open(source_path, "r") as f:
+        ranges, _ = parse_database(f.read())
+    save_fresh_index(index_path, merge_ranges(ranges), source_digest)
+    return MappedFreshIndex(index_path)
+
+
+def load_database_numpy(data):
+    """Load the raw bytes of the database into int64 range start, range end and ingredient ID arrays."""
+    range_section, _, id_section = data.replace(b"\r\n", b"\n").strip().partition(b"\n\n")
+    bounds = np.array(range_section.replace(b"-", b" ").split(), dtype=np.int64)
+    ingredient_ids = np.array(id_section.split(), dtype=np.int64)
+    return bounds[0::2], bounds[1::2], ingredient_ids
+
+
+def merge_ranges_numpy(starts, ends):
+    """
+    Vectorized equivalent of merge_ranges on start and end arrays.
+    After sorting by start, a range begins a new merged range when it starts more
+    than one past the running maximum of all earlier ends.
+    """
+    if len(starts) == 0:
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    running_end = np.maximum.accumulate(ends[order])
+
+    new_range = np.empty(len(starts), dtype=bool)
+    new_range[0] = True
+    new_range[1:] = starts[1:] > running_end[:-1] + 1
+    first = np.flatnonzero(new_range)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return starts[first], running_end[last]
+
+
+def solve_numpy(starts, ends, ingredient_ids):
+    """Return the (part 1, part 2) answers computed with array operations."""
+    merged_starts, merged_ends = merge_ranges_numpy(starts, ends)
+    if len(merged_starts) == 0:
+        return 0, 0
+    # Each ID can only be inside the last merged range starting at or before it
+    candidate = np.searchsorted(merged_starts, ingredient_ids, side="right") - 1
+    fresh = (candidate >= 0) & (ingredient_ids <= merged_ends[np.maximum(candidate, 0)])
+    return int(np.count_nonzero(fresh)), int((merged_ends - merged_starts + 1).sum())
+
+
+def check_numpy_equivalence(trials=500, seed=2025):
+    """Compare the NumPy answers with the pure-Python merge_ranges path on random databases."""
+    rng = random.Random(seed)
+    for _ in range(trials):
+        ranges = []
+        for _ in range(rng.randint(1, 30)):
+            start = rng.randint(0, 1000)
+            ranges.append((start, start + rng.randint(0, 50)))
+        ingredient_ids = [rng.randint(0, 1100) for _ in range(rng.randint(0, 50))]
+
+        merged = merge_ranges(ranges)
+        expected = (
+            sum(1 for i in ingredient_ids if any(start <= i <= end for start, end in merged)),
+            sum(end - start + 1 for start, end in merged),
+        )
+        actual = solve_numpy(
+            np.array([start for start, _ in ranges], dtype=np.int64),
+            np.array([end for _, end in ranges], dtype=np.int64),
+            np.array(ingredient_ids, dtype=np.int64),
+        )
+        if actual != expected:
+            raise AssertionError(f"NumPy mismatch for {ranges} / {ingredient_ids}: {actual} != {expected}")
+    print(f"NumPy equivalence check passed for {trials} random databases")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Day 5: Cafeteria")
+    parser.add_argument("input", nargs="?", default=input_file, help="database file of ranges and ingredient IDs")
+    parser.add_argument("--numpy", action="store_true", help="use the vectorized NumPy backend if available")
+    parser.add_argument("--index", help="binary range index file to reuse, rebuilt when the input changes")
+    parser.add_argument("--check", action="store_true", help="check the NumPy backend against the pure-Python path")
+    args = parser.parse_args()
+
+    if (args.numpy or args.check) and np is None:
+        print("NumPy is not installed, falling back to the pure-Python backend", file=sys.stderr)
+        args.numpy = args.check = False
+
+    if args.check:
+        check_numpy_equivalence()
+
+    if args.numpy:
+        with open(args.input, "rb") as f:
+            fresh_count, total_fresh_ids = solve_numpy(*load_database_numpy(f.read()))
+    elif args.index:
+        # Only the ingredient IDs are parsed; the merged ranges come from the mapped index
+        fresh_index = load_fresh_index(args.input, args.index)
+        with open(args.input, "r") as f:
+            ingredient_ids = parse_ingredient_ids(f.read())
+        fresh_count = fresh_index.count_fresh(ingredient_ids)
+        total_fresh_ids = fresh_index.total_fresh
+        fresh_index.close()
+    else:
+        # Read the input file
+        with open(args.input, "r") as f:
+            ranges, ingredient_ids = parse_database(f.read())
+
+        # Check which ingredient IDs are fresh
+        fresh_ranges = FreshRangeSet(ranges)
+        fresh_count = fresh_ranges.count_fresh(ingredient_ids)
+
+        # Part 2: Count total unique ingredient IDs in all ranges
+        # The range set keeps its ranges merged, so the total is maintained as it is built
+        total_fresh_ids = fresh_ranges.total_fresh
+
+    print(f"Part 1: Number of fresh ingredient IDs: {fresh_count}")
+    print(f"Part 2: Total ingredient IDs considered fresh: {total_fresh_ids}")
@@ -1,3 +1,9 @@
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 """
 --- Day 6: Trash Compactor ---
 After helping the Elves in the kitchen, you were taking a break and helping them re-enact a movie scene when you over-enthusiastically jumped into the garbage chute!
@@ -55,202 +61,348 @@ Solve the problems on the math worksheet again. What is the grand total found by
 
 input_file = "puzzles/inputs/day6.txt"
 
-# Read the input file
-with open(input_file, "r") as f:
-    lines = [line.rstrip("\n") for line in f.readlines()]
-
-# Find the maximum width to handle all columns
-max_width = max(len(line) for line in lines)
-
-# Pad all lines to the same width
-for i in range(len(lines)):
-    lines[i] = lines[i].ljust(max_width)
-
-# Extract problems column by column
-problems = []
-col = 0
-while col < max_width:
-    # Check if this column is a space column (separator)
-    is_separator = all(lines[row][col] == " " for row in range(len(lines)))
-
-    if not is_separator:
-        # Extract this problem (starting at this column)
-        problem_numbers = []
-        operation = None
-
-        # Read vertically until we hit the operation or end
-        for row in range(len(lines)):
-            cell = lines[row][col:].split()[0] if col < len(lines[row]) and lines[row][col] != " " else ""
-            if cell in ["+", "*"]:
-                operation = cell
-                break
-            elif cell:
-                try:
-                    problem_numbers.append(int(cell))
-                except ValueError:
-                    pass
-
-        if problem_numbers and operation:
-            problems.append((problem_numbers, operation))
-
-        # Move to next non-space column
-        col += 1
-        while col < max_width and all(lines[row][col] == " " for row in range(len(lines))):
-            col += 1
-    else:
-        col += 1
-
-# Actually, let me reparse this properly by identifying problem columns
-# A problem column contains numbers and ends with an operation symbol
 
-
-# Better approach: split by columns of spaces
-def extract_problems_from_grid(lines):
+def iter_problem_blocks(lines):
+    """
+    Yield each problem as the list of its columns, each column a tuple of characters
+    from top to bottom. The worksheet is transposed once, and a column of only spaces
+    closes the current block, so separators are found in a single scan.
+    """
     if not lines:
-        return []
+        return
 
     max_width = max(len(line) for line in lines)
     # Pad all lines
     padded_lines = [line.ljust(max_width) for line in lines]
 
-    problems = []
-    col = 0
+    yield from group_columns(zip(*padded_lines))
+
+
+def iter_column_spans(columns):
+    """
+    Yield (start, end, block) for each problem block in a stream of columns, where
+    block holds columns start to end - 1 and a column of only spaces separates blocks.
+    """
+    block = []
+    col = -1
+    for col, column in enumerate(columns):
+        if column.count(" ") == len(column):
+            if block:
+                yield col - len(block), col, block
+                block = []
+        else:
+            block.append(column)
+    if block:
+        yield col + 1 - len(block), col + 1, block
+
+
+def group_columns(columns):
+    """Group a stream of columns into problem blocks, closing a block at each column of only spaces."""
+    for _, _, block in iter_column_spans(columns):
+        yield block
+
+
+def find_row_bounds(path, chunk_size=1 << 20):
+    """Return the (offset, length) of each row of a file, scanning it in fixed-size chunks."""
+    bounds = []
+    row_start = 0
+    position = 0
+    previous = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            newline = chunk.find(b"\n")
+            while newline != -1:
+                row_end = position + newline
+                # Leave a Windows line ending's carriage return out of the row
+                before = chunk[newline - 1 : newline] if newline > 0 else previous
+                if before == b"\r" and row_end > row_start:
+                    row_end -= 1
+                bounds.append((row_start, row_end - row_start))
+                row_start = position + newline + 1
+                newline = chunk.find(b"\n", newline + 1)
+            previous = chunk[-1:]
+            position += len(chunk)
+    if position > row_start:
+        bounds.append((row_start, position - row_start))
+    return bounds
+
+
+def iter_file_columns(path, window=1 << 16):
+    """
+    Yield the columns of a worksheet file, top to bottom, without loading whole rows.
+
+    Every row is read in step through fixed-size column windows by seeking to each
+    row's current offset, so only one window per row is held in memory at a time.
+    """
+    row_bounds = find_row_bounds(path)
+    offsets = [offset for offset, _ in row_bounds]
+    remaining = [length for _, length in row_bounds]
+    with open(path, "rb", buffering=0) as f:
+        while any(remaining):
+            width = min(window, max(remaining))
+            chunks = []
+            for row in range(len(row_bounds)):
+                size = min(width, remaining[row])
+                chunk = ""
+                if size:
+                    f.seek(offsets[row])
+                    chunk = f.read(size).decode()
+                    offsets[row] += size
+                    remaining[row] -= size
+                # Short rows are padded with spaces, as in the in-memory parser
+                chunks.append(chunk.ljust(width))
+            yield from zip(*chunks)
+
+
+def parse_problem_rows(block):
+    """Parse a problem block row by row (part 1), returning (numbers, operation) or None."""
+    problem_text = []
+    for row in zip(*block):
+        cell = "".join(row).strip()
+        if cell:
+            problem_text.append(cell)
+
+    if not problem_text or problem_text[-1] not in ["+", "*"]:
+        return None
+    numbers = []
+    for item in problem_text[:-1]:
+        try:
+            numbers.append(int(item))
+        except ValueError:
+            pass
+    return (numbers, problem_text[-1]) if numbers else None
+
+
+def parse_problem_columns(block):
+    """Parse a problem block column by column, right-to-left (part 2), returning (numbers, operation) or None."""
+    problem_numbers = []
+    operation = None
+
+    for column in reversed(block):
+        # Read this column top to bottom to form a number
+        digits = [char for char in column if char.isdigit()]
+        if digits:
+            problem_numbers.append(int("".join(digits)))
+
+        # The operator sits under the leftmost column, so stop once it is found
+        operators = [char for char in column if char in ["+", "*"]]
+        if operators:
+            operation = operators[-1]
+            break
 
-    while col < max_width:
-        # Skip leading spaces
-        while col < max_width and all(padded_lines[row][col] == " " for row in range(len(padded_lines))):
-            col += 1
+    return (problem_numbers, operation) if problem_numbers and operation else None
+
+
+def product_tree(numbers):
+    """
+    Multiply numbers pairwise in rounds, like a balanced binary tree, so both operands
+    of each multiplication stay similar in size. Multiplying a huge running product by
+    one small number at a time costs far more once the product has thousands of digits.
+    """
+    values = list(numbers)
+    if not values:
+        return 1
+    while len(values) > 1:
+        paired = [values[i] * values[i + 1] for i in range(0, len(values) - 1, 2)]
+        if len(values) % 2:
+            paired.append(values[-1])
+        values = paired
+    return values[0]
 
-        if col >= max_width:
-            break
 
-        # Find the end of this problem column (next full space column or end)
-        end_col = col + 1
-        while end_col < max_width:
-            if all(padded_lines[row][end_col] == " " for row in range(len(padded_lines))):
-                break
-            end_col += 1
-
-        # Extract the problem from this column range
-        problem_text = []
-        for row in range(len(padded_lines)):
-            cell = padded_lines[row][col:end_col].strip()
-            if cell:
-                problem_text.append(cell)
-
-        # Parse the problem
-        if problem_text:
-            operation = problem_text[-1] if problem_text[-1] in ["+", "*"] else None
-            if operation:
-                numbers = []
-                for item in problem_text[:-1]:
-                    try:
-                        numbers.append(int(item))
-                    except ValueError:
-                        pass
-                if numbers:
-                    problems.append((numbers, operation))
-
-        col = end_col
-
-    return problems
-
-
-problems = extract_problems_from_grid(lines)
-
-# Calculate the result for each problem
-grand_total = 0
-for numbers, operation in problems:
+def solve_problem(numbers, operation):
+    """Return the result of adding or multiplying a problem's numbers."""
     if operation == "+":
-        result = sum(numbers)
-    else:  # operation == '*'
-        result = 1
-        for num in numbers:
-            result *= num
-    grand_total += result
+        # Integer sum is exact however large the numbers get
+        return sum(numbers)
+    return product_tree(numbers)  # operation == '*'
 
-print(f"Part 1: Grand total: {grand_total}")
+
+def extract_problems_from_grid(lines):
+    """Return the (numbers, operation) problems of a worksheet read row by row."""
+    return [problem for problem in map(parse_problem_rows, iter_problem_blocks(lines)) if problem]
 
 
 # Part 2: Read numbers as digits in columns, right-to-left
 def extract_problems_part2(lines):
+    """Return the (numbers, operation) problems of a worksheet read column by column, right-to-left."""
+    return [problem for problem in map(parse_problem_columns, iter_problem_blocks(lines)) if problem]
+
+
+def solve_worksheet(blocks):
+    """Return the (part 1, part 2) grand totals for a stream of problem blocks."""
+    # Both parts read the same blocks, so the worksheet is only split once
+    grand_total = 0
+    grand_total_part2 = 0
+    for block in blocks:
+        problem = parse_problem_rows(block)
+        if problem:
+            grand_total += solve_problem(*problem)
+        problem_part2 = parse_problem_columns(block)
+        if problem_part2:
+            grand_total_part2 += solve_problem(*problem_part2)
+    return grand_total, grand_total_part2
+
+
+def split_into_shards(lines, shard_count):
+    """
+    Split a worksheet at separator columns into at most shard_count sub-worksheets.
+
+    Consecutive problems are grouped until a shard reaches its share of the estimated
+    cost (cells, weighted up for multiplication), so a big problem gets a shard of its
+    own while small ones are batched. Shards are returned most expensive first.
+
+    This pads and transposes the whole sheet serially to find the spans; each worker
+    then transposes its own shard again to parse it.
+    """
     if not lines:
         return []
-
     max_width = max(len(line) for line in lines)
-    # Pad all lines
     padded_lines = [line.ljust(max_width) for line in lines]
 
-    problems = []
-    col = 0
-
-    while col < max_width:
-        # Skip leading spaces
-        while col < max_width and all(padded_lines[row][col] == " " for row in range(len(padded_lines))):
-            col += 1
-
-        if col >= max_width:
-            break
-
-        # Find the end of this problem column (next full space column or end)
-        end_col = col + 1
-        while end_col < max_width:
-            if all(padded_lines[row][end_col] == " " for row in range(len(padded_lines))):
-                break
-            end_col += 1
-
-        # Extract the problem from this column range
-        # For part 2, we read digit by digit from each column, right-to-left
-        problem_numbers = []
-        operation = None
-
-        # Process each column in this problem range, from right to left
-        for c in range(end_col - 1, col - 1, -1):
-            # Read this column top to bottom to form a number
-            digits = []
-            found_operation = False
-            for row in range(len(padded_lines)):
-                char = padded_lines[row][c]
-                if char in ["+", "*"]:
-                    operation = char
-                    found_operation = True
-                    # Don't break - continue to see if there are digits above
-                elif char.isdigit():
-                    digits.append(char)
-                # Skip spaces within column
-
-            # Add the number if we found digits (even if we also found an operator)
-            if digits:
-                # Form number from digits (top to bottom)
-                number = int("".join(digits))
-                problem_numbers.append(number)
-
-            # Stop processing more columns if we found the operator
-            if found_operation:
-                break
-
-        if problem_numbers and operation:
-            problems.append((problem_numbers, operation))
-
-        col = end_col
-
-    return problems
-
-
-problems_part2 = extract_problems_part2(lines)
-
-# Note: Problems are found left-to-right, but result should be the same
-# The key difference is that within each problem, we read columns right-to-left
-
-# Calculate the result for each problem
-grand_total_part2 = 0
-for numbers, operation in problems_part2:
-    if operation == "+":
-        result = sum(numbers)
-    else:  # operation == '*'
-        result = 1
-        for num in numbers:
-            result *= num
-    grand_total_part2 += result
-
-print(f"Part 2: Grand total: {grand_total_part2}")
+    # Find the column span of every problem with the same scan the parsers use
+    spans = [(start, end) for start, end, _ in iter_column_spans(zip(*padded_lines))]
+
+    costs = []
+    for start, end in spans:
+        weight = 4 if "*" in padded_lines[-1][start:end] else 1
+        costs.append((end - start) * len(padded_lines) * weight)
+    target = sum(costs) / max(shard_count, 1)
+
+    shards = []
+    shard_start = None
+    shard_cost = 0
+    for (start, end), cost in zip(spans, costs):
+        if shard_start is None:
+            shard_start = start
+        shard_cost += cost
+        if shard_cost >= target:
+            shards.append((shard_cost, [line[shard_start:end] for line in padded_lines]))
+            shard_start = None
+            shard_cost = 0
+    if shard_start is not None:
+        shards.append((shard_cost, [line[shard_start:] for line in padded_lines]))
+
+    shards.sort(key=lambda shard: shard[0], reverse=True)
+    return [shard_lines for _, shard_lines in shards]
+
+
+def evaluate_shard(shard_lines):
+    """
+    Worker task: parse and reduce one shard for both parts.
+    Returns (part 1 total, part 2 total, parse seconds, reduce seconds).
+    """
+    start_time = time.perf_counter()
+    problems = [(parse_problem_rows(block), parse_problem_columns(block)) for block in iter_problem_blocks(shard_lines)]
+    parse_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    grand_total = sum(solve_problem(*problem) for problem, _ in problems if problem)
+    grand_total_part2 = sum(solve_problem(*problem_part2) for _, problem_part2 in problems if problem_part2)
+    return grand_total, grand_total_part2, parse_time, time.perf_counter() - start_time
+
+
+def solve_worksheet_parallel(lines, workers):
+    """
+    Evaluate a worksheet's shards in a process pool and return the (part 1, part 2) totals.
+
+    Shards are submitted individually, most expensive first, so idle workers keep
+    pulling the next shard from the shared queue and one slow multiplication problem
+    doesn't hold up a fixed share of the sheet. Prints the time spent in each phase,
+    including the serial split in this process, which the total also covers.
+    """
+    start_time = time.perf_counter()
+    shards = split_into_shards(lines, workers * 8)
+    split_time = time.perf_counter() - start_time
+
+    grand_total = 0
+    grand_total_part2 = 0
+    parse_time = 0.0
+    reduce_time = 0.0
+    with ProcessPoolExecutor(max_workers=workers, initializer=sys.set_int_max_str_digits, initargs=(0,)) as executor:
+        futures = [executor.submit(evaluate_shard, shard) for shard in shards]
+        for future in as_completed(futures):
+            shard_total, shard_total_part2, shard_parse_time, shard_reduce_time = future.result()
+            grand_total += shard_total
+            grand_total_part2 += shard_total_part2
+            parse_time += shard_parse_time
+            reduce_time += shard_reduce_time
+    total_time = time.perf_counter() - start_time
+
+    print(f"  Split:  {split_time:.3f}s serial in the parent (pad, transpose, scan) into {len(shards)} shards")
+    print(f"  Parse:  {parse_time:.3f}s across workers")
+    print(f"  Reduce: {reduce_time:.3f}s across workers")
+    print(f"  Total:  {total_time:.3f}s wall clock with {workers} workers")
+    return grand_total, grand_total_part2
+
+
+def make_tall_worksheet(height, problem_count, digits=4, seed=2025):
+    """Build worksheet lines with problem_count problems, each height numbers tall."""
+    rng = random.Random(seed)
+    rows = [[] for _ in range(height + 1)]
+    for problem in range(problem_count):
+        for row in range(height):
+            rows[row].append(str(rng.randint(10 ** (digits - 1), 10**digits - 1)))
+        rows[height].append(("*" if problem % 2 == 0 else "+").ljust(digits))
+    return [" ".join(row) for row in rows]
+
+
+def benchmark_reduction(height=5000, problem_count=20):
+    """Time the grand totals of a tall worksheet with a running product and with the product tree."""
+    start_time = time.perf_counter()
+    problems = extract_problems_from_grid(make_tall_worksheet(height, problem_count))
+    parse_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    naive_total = 0
+    for numbers, operation in problems:
+        if operation == "+":
+            naive_total += sum(numbers)
+        else:
+            result = 1
+            for num in numbers:
+                result *= num
+            naive_total += result
+    naive_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    tree_total = sum(solve_problem(numbers, operation) for numbers, operation in problems)
+    tree_time = time.perf_counter() - start_time
+
+    if naive_total != tree_total:
+        raise AssertionError("Product tree total does not match the running product")
+    print(f"Benchmark: {problem_count} problems x {height} rows, parsed in {parse_time:.3f}s")
+    print(f"  Running product: {naive_time:.3f}s")
+    print(f"  Product tree:    {tree_time:.3f}s ({naive_time / max(tree_time, 1e-9):.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Day 6: Trash Compactor")
+    parser.add_argument("input", nargs="?", default=input_file, help="worksheet file")
+    parser.add_argument(
+        "--stream", action="store_true", help="read the worksheet in column windows instead of whole rows"
+    )
+    parser.add_argument("--window", type=int, default=1 << 16, help="column window size in bytes for --stream")
+    parser.add_argument("--workers", type=int, default=1, help="evaluate shards of the worksheet in worker processes")
+    parser.add_argument("--benchmark", action="store_true", help="time the reductions on a tall synthetic worksheet")
+    args = parser.parse_args()
+
+    # Products of tall multiplication problems can run to far more digits than the default str limit
+    sys.set_int_max_str_digits(0)
+
+    if args.benchmark:
+        benchmark_reduction()
+
+    if args.stream:
+        grand_total, grand_total_part2 = solve_worksheet(group_columns(iter_file_columns(args.input, args.window)))
+    else:
+        # Read the input file
+        with open(args.input, "r") as f:
+            lines = [line.rstrip("\n") for line in f.readlines()]
+        if args.workers > 1:
+            grand_total, grand_total_part2 = solve_worksheet_parallel(lines, args.workers)
+        else:
+            grand_total, grand_total_part2 = solve_worksheet(iter_problem_blocks(lines))
+
+    print(f"Part 1: Grand total: {grand_total}")
+    print(f"Part 2: Grand total: {grand_total_part2}")
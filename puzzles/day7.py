@@ -1,3 +1,7 @@
+import argparse
+from bisect import bisect_right
+from collections import defaultdict
+
 """
 --- Day 7: Laboratories ---
 You thank the cephalopods for the help and exit the trash compactor, finding yourself in the familiar halls of a North Pole research wing.
@@ -195,103 +199,213 @@ Apply the many-worlds interpretation of quantum tachyon splitting to your manifo
 
 input_file = "puzzles/inputs/day7.txt"
 
-# Read the input file
-with open(input_file, "r") as f:
-    grid = [line.rstrip("\n") for line in f.readlines()]
-
-# Find the starting position 'S'
-start_row = -1
-start_col = -1
-for r in range(len(grid)):
-    for c in range(len(grid[r])):
-        if grid[r][c] == "S":
-            start_row = r
-            start_col = c
-            break
-    if start_row != -1:
-        break
-
-# Simulate tachyon beams
-# Each beam has a position (row, col) and moves downward
-# When a beam hits a splitter (^), it stops and creates two new beams (left and right)
+def find_start(grid):
+    """Return the (row, col) of the starting position 'S', or (-1, -1) if there is none."""
+    for r in range(len(grid)):
+        col = grid[r].find("S")
+        if col != -1:
+            return r, col
+    return -1, -1
 
-beams = [(start_row, start_col)]  # Starting beam position
-split_count = 0
-processed = set()  # Track processed splitters to avoid counting the same split multiple times
 
-while beams:
-    new_beams = []
+# Simulate tachyon beams
+# Active beam columns are the set bits of one int, and each row's splitters are another.
+# A beam that hits a splitter stops and is replaced by beams just left and right of it.
+SPLITTER_BITS = str.maketrans("^.S", "100")
 
-    for row, col in beams:
-        # Move beam downward until it hits a splitter or exits
-        current_row = row + 1
 
-        while current_row < len(grid):
-            if col < len(grid[current_row]) and grid[current_row][col] == "^":
-                # Hit a splitter - create two new beams
-                if (current_row, col) not in processed:
-                    split_count += 1
-                    processed.add((current_row, col))
+def splitter_mask(row):
+    """Return a bitmask with bit c set where the row has a splitter (^) in column c."""
+    return int(row[::-1].translate(SPLITTER_BITS) or "0", 2)
 
-                    # Create left and right beams
-                    left_col = col - 1
-                    right_col = col + 1
 
-                    if left_col >= 0:
-                        new_beams.append((current_row, left_col))
-                    if right_col < len(grid[current_row]):
-                        new_beams.append((current_row, right_col))
+def compile_splitter_rows(grid, start_row):
+    """
+    Return (splitter mask, row width) for each row below start_row that has a splitter.
+    Rows without splitters never change a beam, so both sweeps skip them entirely.
+    """
+    splitter_rows = []
+    for row in grid[start_row + 1 :]:
+        mask = splitter_mask(row)
+        if mask:
+            splitter_rows.append((mask, len(row)))
+    return splitter_rows
 
-                break  # Stop this beam
-            current_row += 1
 
-    beams = new_beams
+def count_splits(splitter_rows, start_col):
+    """
+    Count the splitters hit by any beam, sweeping the manifold one splitter row at a time.
+    Each row is a handful of bitwise operations on the beam mask, and every
+    splitter sits in exactly one row, so popcount of the hits counts each split once.
+    """
+    beams = 1 << start_col
+    split_count = 0
+    for mask, width in splitter_rows:
+        hits = beams & mask
+        if hits:
+            split_count += hits.bit_count()
+            row_mask = (1 << width) - 1
+            beams = (beams & ~hits) | ((hits << 1) & row_mask) | (hits >> 1)
+            if not beams:
+                break
+    return split_count
 
-print(f"Part 1: Total beam splits: {split_count}")
 
 # Part 2: Count timelines using many-worlds interpretation
 # Each particle path represents a unique timeline
 # When a particle hits a splitter, it takes BOTH left and right paths
 
 
-def count_timelines(grid, start_row, start_col):
+def count_timelines(splitter_rows, start_col):
     """
     Count the number of unique timelines (paths) through the manifold.
-    We track the number of ways to reach each position.
+    We track the number of ways to reach each column in a preallocated buffer of
+    Python ints (timeline counts grow far past 64 bits) that is updated in place.
+    A bitmask of the columns with a nonzero count is kept alongside it, so each
+    splitter row only touches the splitters a particle actually reaches.
     """
-    # Use dynamic programming: count[row][col] = number of paths reaching this position
-    max_row = len(grid)
+    width = max([start_col + 1] + [row_width for _, row_width in splitter_rows])
+
+    # paths[col] = number of ways to reach column col; bit col of active is set when it is nonzero
+    paths = [0] * width
+    paths[start_col] = 1
+    active = 1 << start_col
+
+    for mask, row_width in splitter_rows:
+        hits = active & mask
+        if not hits:
+            continue  # Every particle continues downward unchanged
+
+        splitters = []
+        remaining = hits
+        while remaining:
+            lowest = remaining & -remaining
+            splitters.append(lowest.bit_length() - 1)
+            remaining ^= lowest
+
+        # Read every count before updating, so a particle split onto a neighbouring
+        # splitter (as in ^^) is not split again in the same row
+        counts = [paths[col] for col in splitters]
+        for col, count in zip(splitters, counts):
+            # Particle splits - goes left and right
+            paths[col] -= count
+            if col - 1 >= 0:
+                paths[col - 1] += count
+            if col + 1 < row_width:
+                paths[col + 1] += count
+
+        row_mask = (1 << row_width) - 1
+        active = (active & ~hits) | ((hits << 1) & row_mask) | (hits >> 1)
 
-    # We'll process row by row, tracking how many ways we can reach each column
-    # Start with 1 way to reach the starting position
-    current_paths = {start_col: 1}
-
-    for row in range(start_row + 1, max_row):
-        next_paths = {}
-
-        for col, count in current_paths.items():
-            # Check if this position has a splitter
-            if col < len(grid[row]) and grid[row][col] == "^":
-                # Particle splits - goes left and right
-                left_col = col - 1
-                right_col = col + 1
+    # Sum all the paths that exited the manifold
+    return sum(paths)
 
-                if left_col >= 0:
-                    next_paths[left_col] = next_paths.get(left_col, 0) + count
-                if right_col < len(grid[row]):
-                    next_paths[right_col] = next_paths.get(right_col, 0) + count
-            else:
-                # Particle continues downward
-                next_paths[col] = next_paths.get(col, 0) + count
 
-        current_paths = next_paths
+# Sparse splitter graph: each splitter points straight at the first splitter (or the exit)
+# below its left and right outputs, so empty space never has to be stepped through
+EXIT = "exit"  # Target of a beam that leaves the bottom of the manifold
 
-        if not current_paths:
-            break
 
-    # Sum all the paths that exited the manifold
-    return sum(current_paths.values())
+def first_splitter_below(column_rows, row, col):
+    """Return the first splitter strictly below row in column col, or EXIT if there is none."""
+    rows = column_rows.get(col)
+    if rows:
+        i = bisect_right(rows, row)
+        if i < len(rows):
+            return (rows[i], col)
+    return EXIT
 
 
-timeline_count = count_timelines(grid, start_row, start_col)
-print(f"Part 2: Total timelines: {timeline_count}")
+def compile_splitter_graph(grid, start_row, start_col):
+    """
+    Compile the reachable part of the manifold into a DAG over its splitters.
+    Returns (first, edges): first is the target of the starting beam, and edges maps
+    each splitter (row, col) reached from it to its (left, right) targets. A target
+    is a splitter, EXIT for a beam leaving the bottom, or None for a beam leaving the side.
+    """
+    # Splitter rows per column, in ascending order because rows are scanned top to bottom
+    column_rows = defaultdict(list)
+    for row in range(start_row + 1, len(grid)):
+        line = grid[row]
+        col = line.find("^")
+        while col != -1:
+            column_rows[col].append(row)
+            col = line.find("^", col + 1)
+
+    # Only link splitters that a beam from the start can reach
+    first = first_splitter_below(column_rows, start_row, start_col)
+    edges = {}
+    stack = [] if first == EXIT else [first]
+    while stack:
+        splitter = stack.pop()
+        if splitter in edges:
+            continue
+        row, col = splitter
+        left = first_splitter_below(column_rows, row, col - 1) if col - 1 >= 0 else None
+        right = first_splitter_below(column_rows, row, col + 1) if col + 1 < len(grid[row]) else None
+        edges[splitter] = (left, right)
+        for target in (left, right):
+            if target is not None and target != EXIT and target not in edges:
+                stack.append(target)
+
+    return first, edges
+
+
+def count_reachable_splitters(edges):
+    """Count the splitters reachable from the starting beam, i.e. the number of splits."""
+    # The graph only holds reachable splitters
+    return len(edges)
+
+
+def count_graph_timelines(first, edges):
+    """
+    Count timelines with a memoized depth-first pass from the first splitter.
+    Each splitter's count is the sum of its two targets' counts and is computed once.
+    """
+    timelines = {EXIT: 1, None: 0}
+    stack = [first]
+    while stack:
+        splitter = stack[-1]
+        if splitter in timelines:
+            stack.pop()
+            continue
+        pending = [target for target in edges[splitter] if target not in timelines]
+        if pending:
+            stack.extend(pending)
+        else:
+            left, right = edges[splitter]
+            timelines[splitter] = timelines[left] + timelines[right]
+            stack.pop()
+    return timelines[first]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Day 7: Laboratories")
+    parser.add_argument("input", nargs="?", default=input_file, help="manifold diagram file")
+    parser.add_argument(
+        "--engine",
+        choices=["sweep", "graph"],
+        default="sweep",
+        help="row sweep with bitmasks, or a pass over the compiled splitter graph",
+    )
+    args = parser.parse_args()
+
+    # Read the input file
+    with open(args.input, "r") as f:
+        grid = [line.rstrip("\n") for line in f.readlines()]
+
+    start_row, start_col = find_start(grid)
+
+    if args.engine == "graph":
+        # Compile the splitter graph once; both parts are passes over its reachable splitters only
+        first_splitter, splitter_edges = compile_splitter_graph(grid, start_row, start_col)
+        split_count = count_reachable_splitters(splitter_edges)
+        timeline_count = count_graph_timelines(first_splitter, splitter_edges)
+    else:
+        # Build the splitter masks once; both sweeps walk the same splitter rows
+        splitter_rows = compile_splitter_rows(grid, start_row)
+        split_count = count_splits(splitter_rows, start_col)
+        timeline_count = count_timelines(splitter_rows, start_col)
+
+    print(f"Part 1: Total beam splits: {split_count}")
+    print(f"Part 2: Total timelines: {timeline_count}")